@@ -1,3 +1,503 @@
-from django.test import TestCase
+import threading
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.test import RequestFactory, SimpleTestCase
+from yfinance.exceptions import YFPricesMissingError, YFTickerMissingError, YFTzMissingError
+
+from . import views, yf_fetch
+
+
+class TTLCacheTests(SimpleTestCase):
+    def test_hit_and_miss(self):
+        cache = yf_fetch.TTLCache()
+        self.assertEqual(cache.get("a"), (False, None))
+        cache.set("a", 1, ttl=60)
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_expired_entry_is_a_miss(self):
+        cache = yf_fetch.TTLCache()
+        cache.set("a", 1, ttl=-1)
+        self.assertEqual(cache.get("a"), (False, None))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = yf_fetch.TTLCache(maxsize=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.get("c"), (True, 3))
+
+
+class CachedTests(SimpleTestCase):
+    def setUp(self):
+        yf_fetch._CACHE.clear()
+        self.addCleanup(yf_fetch._CACHE.clear)
+        self.calls = []
+
+    def fetch(self, ticker_symbol, **kwargs):
+        self.calls.append(ticker_symbol)
+        return {"symbol": ticker_symbol, **kwargs}
+
+    def test_repeat_call_is_served_from_cache(self):
+        fetch = yf_fetch.cached("test", ttl=60)(self.fetch)
+        self.assertEqual(fetch("AAPL", period="1mo"), {"symbol": "AAPL", "period": "1mo"})
+        self.assertEqual(fetch("AAPL", period="1mo"), {"symbol": "AAPL", "period": "1mo"})
+        self.assertEqual(self.calls, ["AAPL"])
+
+    def test_different_arguments_miss(self):
+        fetch = yf_fetch.cached("test", ttl=60)(self.fetch)
+        fetch("AAPL", period="1mo")
+        fetch("AAPL", period="1y")
+        fetch("MSFT", period="1mo")
+        self.assertEqual(self.calls, ["AAPL", "AAPL", "MSFT"])
+
+    def test_no_cache_result_is_returned_but_not_stored(self):
+        @yf_fetch.cached("test", ttl=60)
+        def fetch(ticker_symbol):
+            self.calls.append(ticker_symbol)
+            return yf_fetch.NoCache({"error": "try again"})
+
+        self.assertEqual(fetch("AAPL"), {"error": "try again"})
+        self.assertEqual(fetch("AAPL"), {"error": "try again"})
+        self.assertEqual(self.calls, ["AAPL", "AAPL"])
+
+
+class HistoricalDataBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.index = pd.DatetimeIndex(["2024-01-02", "2024-01-03"], name="Date")
+
+    def download(self, frame):
+        return mock.patch.object(yf_fetch.yf, "download", return_value=frame)
+
+    def test_multi_index_frame_is_split_per_symbol(self):
+        columns = pd.MultiIndex.from_product([["AAPL", "MSFT"], ["Open", "Close"]])
+        frame = pd.DataFrame([[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, np.nan, np.nan]], index=self.index, columns=columns)
+        with self.download(frame) as download:
+            result = yf_fetch.get_historical_data_batch_as_json(["aapl", "msft"], period="1mo")
+        self.assertEqual(download.call_args.args[0], "AAPL MSFT")
+        self.assertEqual(result, {
+            "AAPL": [
+                {"Date": "2024-01-02 00:00:00", "Open": 1.0, "Close": 2.0},
+                {"Date": "2024-01-03 00:00:00", "Open": 5.0, "Close": 6.0},
+            ],
+            # Dates where only the other symbol traded are dropped
+            "MSFT": [{"Date": "2024-01-02 00:00:00", "Open": 3.0, "Close": 4.0}],
+        })
+
+    def test_flat_frame_for_a_single_symbol(self):
+        frame = pd.DataFrame({"Open": [1.0, 5.0], "Close": [2.0, 6.0]}, index=self.index)
+        with self.download(frame):
+            result = yf_fetch.get_historical_data_batch_as_json(["AAPL"])
+        self.assertEqual(result, {
+            "AAPL": [
+                {"Date": "2024-01-02 00:00:00", "Open": 1.0, "Close": 2.0},
+                {"Date": "2024-01-03 00:00:00", "Open": 5.0, "Close": 6.0},
+            ],
+        })
+
+    def test_missing_symbol_gets_empty_list(self):
+        columns = pd.MultiIndex.from_product([["AAPL"], ["Open", "Close"]])
+        frame = pd.DataFrame([[1.0, 2.0], [5.0, 6.0]], index=self.index, columns=columns)
+        with self.download(frame):
+            result = yf_fetch.get_historical_data_batch_as_json(["AAPL", "NOPE"])
+        self.assertEqual(result["NOPE"], [])
+        self.assertEqual(len(result["AAPL"]), 2)
+
+    def test_symbols_are_normalised(self):
+        self.assertEqual(yf_fetch._batch_symbols(["aapl", " MSFT ", "AAPL", ""]), ["AAPL", "MSFT"])
+
+    def test_empty_and_oversized_batches_are_rejected(self):
+        with self.assertRaises(yf_fetch.InvalidBatchError):
+            yf_fetch._batch_symbols(["", " "])
+        with self.assertRaises(yf_fetch.InvalidBatchError):
+            yf_fetch._batch_symbols([f"T{i}" for i in range(yf_fetch.MAX_BATCH_TICKERS + 1)])
+
+    def test_view_returns_400_for_invalid_batch(self):
+        response = views.get_historical_data_batch(RequestFactory().get("/", {"tickers": " , "}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "No tickers provided"})
+
+
+class AcceptsGzipTests(SimpleTestCase):
+    def accepts(self, header):
+        return views.accepts_gzip(RequestFactory().get("/", HTTP_ACCEPT_ENCODING=header))
+
+    def test_gzip_is_accepted(self):
+        self.assertTrue(self.accepts("gzip, deflate"))
+        self.assertFalse(self.accepts("br"))
+        self.assertFalse(self.accepts(""))
+
+    def test_q_values(self):
+        self.assertTrue(self.accepts("deflate, gzip;q=0.5"))
+        self.assertFalse(self.accepts("gzip;q=0"))
+        self.assertFalse(self.accepts("gzip; q=0.0"))
+
+
+class JsonDefaultTests(SimpleTestCase):
+    def test_timestamp(self):
+        self.assertEqual(yf_fetch._json_default(pd.Timestamp("2024-01-02")), "2024-01-02T00:00:00")
+
+    def test_nat(self):
+        self.assertIsNone(yf_fetch._json_default(pd.NaT))
+
+    def test_timedelta(self):
+        self.assertEqual(yf_fetch._json_default(pd.Timedelta(hours=1)), str(pd.Timedelta(hours=1)))
+
+    def test_date_subclass(self):
+        class TradingDay(date):
+            pass
+
+        self.assertEqual(yf_fetch._json_default(TradingDay(2024, 1, 2)), "2024-01-02")
+
+    def test_unsupported_type_raises(self):
+        with self.assertRaises(TypeError):
+            yf_fetch._json_default(object())
+
+    def test_dumps_handles_timestamps_and_nan(self):
+        self.assertEqual(
+            yf_fetch._dumps({"t": pd.Timestamp("2024-01-02"), "n": float("nan")}),
+            b'{"t":"2024-01-02T00:00:00","n":null}',
+        )
+
+
+class FormatHistoricalDataTests(SimpleTestCase):
+    def test_rows_with_formatted_dates(self):
+        index = pd.DatetimeIndex(["2024-01-02", "2024-01-03"], name="Date")
+        df = pd.DataFrame({"Open": [1.0, 2.0], "Volume": [10, 20]}, index=index)
+        self.assertEqual(
+            yf_fetch.format_historical_data(df),
+            [
+                {"Date": "2024-01-02 00:00:00", "Open": 1.0, "Volume": 10},
+                {"Date": "2024-01-03 00:00:00", "Open": 2.0, "Volume": 20},
+            ],
+        )
+
+    def test_intraday_datetime_column(self):
+        index = pd.DatetimeIndex(["2024-01-02 09:30:00"], name="Datetime").tz_localize("America/New_York")
+        df = pd.DataFrame({"Close": [1.0]}, index=index)
+        self.assertEqual(yf_fetch.format_historical_data(df), [{"Datetime": "2024-01-02 09:30:00", "Close": 1.0}])
+
+    def test_non_dataframe_is_passed_through(self):
+        self.assertEqual(yf_fetch.format_historical_data([]), [])
+
+
+class RejectUnknownTickerTests(SimpleTestCase):
+    def setUp(self):
+        yf_fetch._BAD_TICKERS.clear()
+        self.addCleanup(yf_fetch._BAD_TICKERS.clear)
+        self.calls = 0
+
+    def helper(self, error=None):
+        @yf_fetch.reject_unknown_ticker
+        def fetch(ticker_symbol):
+            self.calls += 1
+            if error is not None:
+                raise error
+            return {"symbol": ticker_symbol}
+        return fetch
+
+    def test_known_ticker_passes_through(self):
+        self.assertEqual(self.helper()("AAPL"), {"symbol": "AAPL"})
+
+    def test_missing_ticker_marks_and_short_circuits(self):
+        fetch = self.helper(YFTzMissingError("NOPE"))
+        with self.assertRaises(yf_fetch.UnknownTickerError):
+            fetch("NOPE")
+        with self.assertRaises(yf_fetch.UnknownTickerError):
+            fetch("NOPE")
+        self.assertEqual(self.calls, 1)
+
+    def test_unknown_ticker_error_is_recorded(self):
+        fetch = self.helper(yf_fetch.UnknownTickerError("NOPE"))
+        with self.assertRaises(yf_fetch.UnknownTickerError):
+            fetch("NOPE")
+        self.assertIn("NOPE", yf_fetch._BAD_TICKERS)
+
+    def test_missing_prices_do_not_mark_ticker(self):
+        fetch = self.helper(YFPricesMissingError("AAPL", ""))
+        with self.assertRaises(YFPricesMissingError):
+            fetch("AAPL")
+        self.assertNotIn("AAPL", yf_fetch._BAD_TICKERS)
+
+    def test_other_errors_are_not_cached(self):
+        # The symbol itself contains "404", which must not be mistaken for a not-found error
+        fetch = self.helper(ValueError("404 timeout fetching 4042.T"))
+        with self.assertRaises(ValueError):
+            fetch("4042.T")
+        self.assertNotIn("4042.T", yf_fetch._BAD_TICKERS)
+
+
+class HistoricalDataTests(SimpleTestCase):
+    def setUp(self):
+        yf_fetch._CACHE.clear()
+        yf_fetch._BAD_TICKERS.clear()
+        self.addCleanup(yf_fetch._CACHE.clear)
+        self.addCleanup(yf_fetch._BAD_TICKERS.clear)
+        self.ticker = mock.Mock()
+        patcher = mock.patch.object(yf_fetch, "_ticker", return_value=self.ticker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_history_is_requested_with_raise_errors(self):
+        self.ticker.history.return_value = pd.DataFrame(
+            {"Close": [1.0]}, index=pd.DatetimeIndex(["2024-01-02"], name="Date")
+        )
+        self.assertEqual(
+            yf_fetch.get_historical_data_as_json("AAPL", period="1mo"),
+            [{"Date": "2024-01-02 00:00:00", "Close": 1.0}],
+        )
+        self.ticker.history.assert_called_once_with(raise_errors=True, period="1mo")
+
+    def test_missing_prices_return_empty_list(self):
+        self.ticker.history.side_effect = YFPricesMissingError("AAPL", "")
+        self.assertEqual(yf_fetch.get_historical_data_as_json("AAPL", period="1d"), [])
+        self.assertNotIn("AAPL", yf_fetch._BAD_TICKERS)
+
+    def test_missing_ticker_is_marked_unknown(self):
+        self.ticker.history.side_effect = YFTickerMissingError("NOPE", "no timezone found")
+        with self.assertRaises(yf_fetch.UnknownTickerError):
+            yf_fetch.get_historical_data_as_json("NOPE")
+        self.assertIn("NOPE", yf_fetch._BAD_TICKERS)
+        with self.assertRaises(yf_fetch.UnknownTickerError):
+            yf_fetch.get_historical_data_as_json("NOPE")
+        self.assertEqual(self.ticker.history.call_count, 1)
+
+
+class NewsTests(SimpleTestCase):
+    def setUp(self):
+        yf_fetch._CACHE.clear()
+        yf_fetch._BAD_TICKERS.clear()
+        self.addCleanup(yf_fetch._CACHE.clear)
+        self.addCleanup(yf_fetch._BAD_TICKERS.clear)
+
+    def get_news(self, news):
+        with mock.patch.object(yf_fetch, "_ticker", return_value=SimpleNamespace(news=news)):
+            return yf_fetch.get_news_as_json("AAPL")
+
+    def test_datetime_publish_time_is_converted(self):
+        published = datetime(2024, 1, 2, 9, 30)
+        news = [
+            {"title": "a", "providerPublishTime": published},
+            {"title": "b", "providerPublishTime": 1704187800},
+        ]
+        self.assertEqual(self.get_news(news), [
+            {"title": "a", "providerPublishTime": "2024-01-02T09:30:00"},
+            {"title": "b", "providerPublishTime": 1704187800},
+        ])
+
+    def test_source_items_are_not_mutated(self):
+        published = datetime(2024, 1, 2, 9, 30)
+        news = [{"title": "a", "providerPublishTime": published}, {"title": "b"}]
+        result = self.get_news(news)
+        self.assertIs(news[0]["providerPublishTime"], published)
+        self.assertIsNot(result[0], news[0])
+        # Items without a datetime are passed through as-is
+        self.assertIs(result[1], news[1])
+
+    def test_missing_news(self):
+        self.assertEqual(self.get_news(None), {"error": "No calendar data available"})
+
+
+class CleanDataTests(SimpleTestCase):
+    def setUp(self):
+        self.quarter = pd.Timestamp("2024-03-31")
+
+    def test_none_returns_empty_dict(self):
+        self.assertEqual(yf_fetch.clean_data(None), {})
+
+    def test_empty_frame_returns_empty_dict(self):
+        self.assertEqual(yf_fetch.clean_data(pd.DataFrame()), {})
+
+    def test_all_finite_values_are_kept(self):
+        df = pd.DataFrame({self.quarter: [1.5, 2.0]}, index=["Total Assets", "Total Debt"])
+        self.assertEqual(
+            yf_fetch.clean_data(df),
+            {"2024-03-31 00:00:00": {"Total Assets": 1.5, "Total Debt": 2.0}},
+        )
+
+    def test_nan_becomes_none(self):
+        df = pd.DataFrame({self.quarter: [1.0, np.nan]}, index=["Total Assets", "Total Debt"])
+        self.assertEqual(
+            yf_fetch.clean_data(df),
+            {"2024-03-31 00:00:00": {"Total Assets": 1.0, "Total Debt": None}},
+        )
+
+    def test_inf_becomes_none(self):
+        df = pd.DataFrame({self.quarter: [np.inf, -np.inf, 3.0]}, index=["a", "b", "c"])
+        self.assertEqual(
+            yf_fetch.clean_data(df),
+            {"2024-03-31 00:00:00": {"a": None, "b": None, "c": 3.0}},
+        )
+
+    def test_string_cell_is_left_unchanged(self):
+        df = pd.DataFrame(
+            {self.quarter: ["abc", 1.0, np.nan], pd.Timestamp("2023-12-31"): [np.inf, 2.0, 4.0]},
+            index=["a", "b", "c"],
+        )
+        self.assertEqual(
+            yf_fetch.clean_data(df),
+            {
+                "2024-03-31 00:00:00": {"a": "abc", "b": 1.0, "c": None},
+                "2023-12-31 00:00:00": {"a": None, "b": 2.0, "c": 4.0},
+            },
+        )
+
+    def test_integer_columns_keep_their_type(self):
+        df = pd.DataFrame({self.quarter: [1, 2]}, index=["a", "b"])
+        result = yf_fetch.clean_data(df)
+        self.assertEqual(result, {"2024-03-31 00:00:00": {"a": 1, "b": 2}})
+        self.assertIsInstance(result["2024-03-31 00:00:00"]["a"], int)
+
+    def test_source_frame_is_not_mutated(self):
+        df = pd.DataFrame({self.quarter: [np.inf, np.nan]}, index=["a", "b"])
+        yf_fetch.clean_data(df)
+        self.assertTrue(np.isinf(df.iloc[0, 0]))
+        self.assertEqual(list(df.columns), [self.quarter])
+
+
+class FakeTicker:
+    """Stands in for yf.Ticker: configured attributes are returned, raised if they are exceptions
+    or called if they are functions; anything else is None"""
+    def __init__(self, **attrs):
+        self.attrs = attrs
+
+    def __getattr__(self, name):
+        value = self.attrs.get(name)
+        if isinstance(value, Exception):
+            raise value
+        if callable(value):
+            return value()
+        return value
+
+
+class AnalysisGroupTests(SimpleTestCase):
+    def setUp(self):
+        yf_fetch._CACHE.clear()
+        yf_fetch._BAD_TICKERS.clear()
+        self.addCleanup(yf_fetch._CACHE.clear)
+        self.addCleanup(yf_fetch._BAD_TICKERS.clear)
+
+    def test_attributes_backed_by_one_request_are_read_in_one_task(self):
+        with (
+            mock.patch.object(yf_fetch, "_ticker", return_value=FakeTicker()),
+            mock.patch.object(yf_fetch, "_fetch_analysis_group", wraps=yf_fetch._fetch_analysis_group) as fetch_group,
+        ):
+            yf_fetch.get_analysis_data_as_json("AAPL")
+        groups = [[attr for _, attr in call.args[1]] for call in fetch_group.call_args_list]
+        self.assertEqual(len(groups), len({source for *_, source in yf_fetch.ANALYSIS_ATTRS}))
+        self.assertIn(["earnings_estimate", "revenue_estimate", "eps_trend", "eps_revisions", "growth_estimates"], groups)
+        self.assertIn(["recommendations", "recommendations_summary"], groups)
+        self.assertIn([
+            "insider_purchases",
+            "insider_transactions",
+            "insider_roster_holders",
+            "major_holders",
+            "institutional_holders",
+            "mutualfund_holders",
+        ], groups)
+
+    def test_errors_are_reported_per_attribute(self):
+        error = ValueError("boom")
+        data = FakeTicker(eps_trend=error)
+        self.assertEqual(
+            yf_fetch._fetch_analysis_group(data, [("eps_trend", "eps_trend"), ("eps_revisions", "eps_revisions")]),
+            [("eps_trend", None, error), ("eps_revisions", None, None)],
+        )
+
+
+class AsyncViewMethodTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(views, "get_sector_and_industry_as_json_async", return_value={"sector": "Technology"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_get_and_head_are_allowed(self):
+        for request in (RequestFactory().get("/"), RequestFactory().head("/")):
+            response = await views.get_sector_and_industry(request, "AAPL")
+            self.assertEqual(response.status_code, 200)
+
+    async def test_other_methods_are_rejected(self):
+        response = await views.get_sector_and_industry(RequestFactory().post("/"), "AAPL")
+        self.assertEqual(response.status_code, 405)
+
+
+class AnalysisDataTests(SimpleTestCase):
+    def setUp(self):
+        yf_fetch._CACHE.clear()
+        yf_fetch._BAD_TICKERS.clear()
+        self.addCleanup(yf_fetch._CACHE.clear)
+        self.addCleanup(yf_fetch._BAD_TICKERS.clear)
+        self.fallbacks = {key: fallback for key, _, fallback, _ in yf_fetch.ANALYSIS_ATTRS}
+
+    def get_analysis(self, ticker, calls=1):
+        with mock.patch.object(yf_fetch, "_ticker", return_value=ticker) as make_ticker:
+            for _ in range(calls):
+                result = yf_fetch.get_analysis_data_as_json("AAPL")
+        return result["AAPL"], make_ticker.call_count
+
+    def test_range_index_is_dropped_and_datetimes_formatted(self):
+        holders = pd.DataFrame({
+            "Date Reported": pd.to_datetime(["2024-03-31"]),
+            "Holder": ["Vanguard"],
+            "Shares": [100],
+        })
+        data, _ = self.get_analysis(FakeTicker(institutional_holders=holders))
+        self.assertEqual(
+            data["institutional_holders"],
+            [{"Date Reported": "2024-03-31 00:00:00", "Holder": "Vanguard", "Shares": 100}],
+        )
+
+    def test_meaningful_index_is_kept_as_a_column(self):
+        eps_trend = pd.DataFrame({"current": [1.5, 6.0]}, index=pd.Index(["0q", "0y"], name="period"))
+        grades = pd.DataFrame(
+            {"Firm": ["Acme"]},
+            index=pd.DatetimeIndex(["2024-01-02 09:30:00"], name="GradeDate").tz_localize("UTC"),
+        )
+        data, _ = self.get_analysis(FakeTicker(eps_trend=eps_trend, upgrades_downgrades=grades))
+        self.assertEqual(data["eps_trend"], [{"period": "0q", "current": 1.5}, {"period": "0y", "current": 6.0}])
+        self.assertEqual(data["upgrades_downgrades"], [{"GradeDate": "2024-01-02 09:30:00", "Firm": "Acme"}])
+
+    def test_dict_attribute_is_formatted_per_value(self):
+        targets = {"current": 150.0, "updated": pd.Timestamp("2024-01-02")}
+        data, _ = self.get_analysis(FakeTicker(analyst_price_targets=targets))
+        self.assertEqual(data["analyst_price_targets"], {"current": "150.0", "updated": "2024-01-02 00:00:00"})
+
+    def test_missing_attributes_keep_their_fallback_and_are_cached(self):
+        data, calls = self.get_analysis(FakeTicker(), calls=2)
+        self.assertEqual(data, self.fallbacks)
+        self.assertEqual(calls, 1)
+
+    def test_failed_attribute_falls_back_and_is_not_cached(self):
+        eps_trend = pd.DataFrame({"current": [1.5]}, index=pd.Index(["0q"], name="period"))
+        ticker = FakeTicker(eps_trend=eps_trend, earnings_estimate=ValueError("boom"))
+        with self.assertLogs(yf_fetch.logger, "WARNING"):
+            data, calls = self.get_analysis(ticker, calls=2)
+        self.assertEqual(data["earnings_estimate"], self.fallbacks["earnings_estimate"])
+        # Other attributes in the same request group are still filled in
+        self.assertEqual(data["eps_trend"], [{"period": "0q", "current": 1.5}])
+        self.assertEqual(calls, 2)
+
+    def test_timeout_falls_back_and_is_not_cached(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        ticker = FakeTicker(sustainability=lambda: release.wait(5), analyst_price_targets={"current": 150.0})
+        with mock.patch.object(yf_fetch, "ANALYSIS_TIMEOUT", 0.05), self.assertLogs(yf_fetch.logger, "WARNING"):
+            data, calls = self.get_analysis(ticker, calls=2)
+        self.assertEqual(data["sustainability"], self.fallbacks["sustainability"])
+        self.assertEqual(data["analyst_price_targets"], {"current": "150.0"})
+        self.assertEqual(calls, 2)
+
+    def test_missing_ticker_is_reraised_as_unknown(self):
+        ticker = FakeTicker(earnings_history=YFTickerMissingError("NOPE", "no data"))
+        with mock.patch.object(yf_fetch, "_ticker", return_value=ticker), self.assertLogs(yf_fetch.logger, "WARNING"):
+            with self.assertRaises(yf_fetch.UnknownTickerError):
+                yf_fetch.get_analysis_data_as_json("NOPE")
+        self.assertIn("NOPE", yf_fetch._BAD_TICKERS)
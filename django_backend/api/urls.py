@@ -18,11 +18,21 @@ urlpatterns = [
         views.get_historical_data,
         name="get-historical-data"
     ),
+    path(
+        'get_historical_data_batch/',
+        views.get_historical_data_batch,
+        name="get-historical-data-batch"
+    ),
     path(
         'get_sector_and_industry/<str:ticker>/',
         views.get_sector_and_industry,
         name="get-sector-and-industry"
     ),
+    path(
+        'get_sector_and_industry_batch/',
+        views.get_sector_and_industry_batch,
+        name="get-sector-and-industry-batch"
+    ),
     path(
         'get_calendar/<str:ticker>/',
         views.get_calendar,
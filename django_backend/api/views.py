@@ -1,9 +1,36 @@
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_http_methods
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from .yf_fetch import *
 from datetime import date
 
+def accepts_gzip(request):
+    # Honour q-values: "gzip;q=0" explicitly refuses gzip
+    for coding in request.headers.get("Accept-Encoding", "").split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        if name.lower() != "gzip":
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+def json_bytes_response(data, gzipped=False):
+    # data is already encoded (and optionally compressed) by yf_fetch
+    response = HttpResponse(data, content_type="application/json")
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
 @api_view(["GET"])
 def index(request):
     return render(request, "index.html")
@@ -12,6 +39,8 @@ def index(request):
 def get_balance_sheet(request, ticker):
     try:
         return Response(get_balance_sheet_as_json(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -19,36 +48,71 @@ def get_balance_sheet(request, ticker):
 def get_cash_flow(request, ticker):
     try:
         return Response(get_cash_flow_as_json(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+# async views: the worker is released while waiting on Yahoo when served over ASGI
+@require_http_methods(["GET", "HEAD"])
+async def get_historical_data(request, ticker):
+    try:
+        period = request.GET.get("period", "1mo")    # Default to '1mo'
+        interval = request.GET.get("interval", "1d") # Default to '1d'
+        gzipped = accepts_gzip(request)
+        data = await get_historical_data_as_jsonbytes_async(ticker_symbol=ticker, compress=gzipped, period=period, interval=interval)
+        return json_bytes_response(data, gzipped)
+    except UnknownTickerError as e:
+        return JsonResponse({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
 @api_view(["GET"])
-def get_historical_data(request, ticker):
+def get_historical_data_batch(request):
     try:
+        tickers = request.query_params.get("tickers", "").split(",")  # ?tickers=AAPL,MSFT
         period = request.query_params.get("period", "1mo")    # Default to '1mo'
         interval = request.query_params.get("interval", "1d") # Default to '1d'
-        return Response(get_historical_data_as_json(ticker_symbol=ticker, period=period, interval=interval))
+        return Response(get_historical_data_batch_as_json(tickers, period=period, interval=interval))
+    except InvalidBatchError as e:
+        return Response({"error": str(e)}, status=400)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+@require_http_methods(["GET", "HEAD"])
+async def get_sector_and_industry(request, ticker):
+    try:
+        return JsonResponse(await get_sector_and_industry_as_json_async(ticker), status=200)
+    except UnknownTickerError as e:
+        return JsonResponse({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
 @api_view(["GET"])
-def get_sector_and_industry(request, ticker):
+def get_sector_and_industry_batch(request):
     try:
-        return Response(get_sector_and_industry_as_json(ticker), status=200)
+        tickers = request.query_params.get("tickers", "").split(",")  # ?tickers=AAPL,MSFT
+        return Response(get_sector_and_industry_batch_as_json(tickers), status=200)
+    except InvalidBatchError as e:
+        return Response({"error": str(e)}, status=400)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
 def get_calendar(request, ticker):
     try:
-        return Response(get_cal_as_json(ticker))
+        return json_bytes_response(get_cal_as_jsonbytes(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
 def get_news(request, ticker):
     try:
-        return Response(get_news_as_json(ticker))
+        return json_bytes_response(get_news_as_jsonbytes(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -56,13 +120,19 @@ def get_news(request, ticker):
 def get_profile(request, ticker):
     try:
         return Response(get_company_profile(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
 def get_analysis_data(request, ticker):
     try:
-        return Response(get_analysis_data_as_json(ticker))
+        if accepts_gzip(request):
+            return json_bytes_response(get_analysis_data_as_jsonbytes_gz(ticker), gzipped=True)
+        return json_bytes_response(get_analysis_data_as_jsonbytes(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -70,6 +140,8 @@ def get_analysis_data(request, ticker):
 def get_stock_statistics(request, ticker, quarters):
     try:
         return Response(get_stock_statistics_for_quarters(ticker, quarters))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
     
@@ -77,5 +149,7 @@ def get_stock_statistics(request, ticker, quarters):
 def get_income_statement(request, ticker):
     try:
         return Response(get_income_statement_as_json(ticker))
+    except UnknownTickerError as e:
+        return Response({"error": "unknown ticker", "symbol": e.ticker_symbol}, status=404)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
@@ -1,27 +1,279 @@
 import yfinance as yf
+from yfinance.exceptions import YFPricesMissingError, YFTickerMissingError
+from curl_cffi import requests as curl_requests
 import pandas as pd
-import json
+import numpy as np
+import orjson
+import asyncio
+import gzip
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import wraps
 from datetime import datetime, date
 
+logger = logging.getLogger(__name__)
+
+# Cache TTLs (in seconds)
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# One curl_cffi session shared by every yfinance call so connections are kept alive.
+# Responses are cached by the TTL layer below rather than at the HTTP level.
+_SESSION = curl_requests.Session(impersonate="chrome")
+
+def _ticker(ticker_symbol):
+    return yf.Ticker(ticker_symbol, session=_SESSION)
+
+# Cache Layer
+
+class TTLCache:
+    """In-process key/value store whose entries expire after a per-key ttl.
+    Holds at most maxsize entries, evicting the least recently used first."""
+    def __init__(self, maxsize=1024):
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._store.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self._store.pop(key, None)
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._store[key] = (time.monotonic() + ttl, value)
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._store)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._store.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+class NoCache:
+    """Wraps a helper's result that should be returned but not cached (errors, partial data)"""
+    def __init__(self, value):
+        self.value = value
+
+_CACHE = TTLCache()
+
+# Symbols Yahoo recently reported as unknown, so repeat lookups skip the network
+_BAD_TICKERS = TTLCache(maxsize=4096)
+BAD_TICKER_TTL = 5 * MINUTE
+
+def _mark_unknown(ticker_symbol):
+    logger.info("marking %s as an unknown ticker for %ss", ticker_symbol, BAD_TICKER_TTL)
+    _BAD_TICKERS.set(ticker_symbol, True, BAD_TICKER_TTL)
+
+class UnknownTickerError(Exception):
+    """Raised for symbols Yahoo does not recognise"""
+    def __init__(self, ticker_symbol):
+        super().__init__(f"unknown ticker: {ticker_symbol}")
+        self.ticker_symbol = ticker_symbol
+
+def _is_not_found(error):
+    # Match on exception type / HTTP status, not message text ("4042.T" contains "404").
+    # YFPricesMissingError subclasses YFTickerMissingError but means a known symbol had no
+    # prices for the requested period
+    if isinstance(error, YFPricesMissingError):
+        return False
+    if isinstance(error, (UnknownTickerError, YFTickerMissingError)):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 404
+
+def reject_unknown_ticker(func):
+    """Short-circuit helpers for symbols in _BAD_TICKERS and record new not-found errors"""
+    @wraps(func)
+    def wrapper(ticker_symbol, *args, **kwargs):
+        if ticker_symbol in _BAD_TICKERS:
+            raise UnknownTickerError(ticker_symbol)
+        try:
+            return func(ticker_symbol, *args, **kwargs)
+        except Exception as e:
+            if not _is_not_found(e):
+                raise
+            _mark_unknown(ticker_symbol)
+            if isinstance(e, UnknownTickerError):
+                raise
+            raise UnknownTickerError(ticker_symbol) from e
+    return wrapper
+
+def cached(endpoint, ttl):
+    """Cache the result of a ticker helper for ttl seconds, keyed on its arguments"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(ticker_symbol, *args, **kwargs):
+            raw_key = orjson.dumps([endpoint, ticker_symbol, args, kwargs], option=orjson.OPT_SORT_KEYS, default=str)
+            key = hashlib.md5(raw_key).hexdigest()
+            hit, value = _CACHE.get(key)
+            if hit:
+                logger.debug("cache hit: %s %s (hits=%d, misses=%d)", endpoint, ticker_symbol, _CACHE.hits, _CACHE.misses)
+                return value
+            logger.debug("cache miss: %s %s (hits=%d, misses=%d)", endpoint, ticker_symbol, _CACHE.hits, _CACHE.misses)
+            value = func(ticker_symbol, *args, **kwargs)
+            if isinstance(value, NoCache):
+                return value.value
+            _CACHE.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
+
+# Analysis attributes as (response key, yf.Ticker attribute, fallback message)
+# The last field names the yfinance request behind each attribute. Attributes sharing one
+# read the same lazily fetched state on the Ticker, so they are fetched together
+ANALYSIS_ATTRS = [
+    ("earnings_estimate", "earnings_estimate", "No earnings estimate data available", "earningsTrend"),
+    ("revenue_estimate", "revenue_estimate", "No revenue estimate data available", "earningsTrend"),
+    ("earnings_history", "earnings_history", "No earnings history data available", "earningsHistory"),
+    ("eps_trend", "eps_trend", "No EPS trend data available", "earningsTrend"),
+    ("eps_revisions", "eps_revisions", "No EPS revisions data available", "earningsTrend"),
+    ("growth_estimates", "growth_estimates", "No growth estimate data available", "earningsTrend"),
+    ("recommendations", "recommendations", "No recommendations data available", "recommendationTrend"),
+    ("recommendations_summary", "recommendations_summary", "No recommendations summary data available", "recommendationTrend"),
+    ("upgrades_downgrades", "upgrades_downgrades", "No upgrades/downgrades data available", "upgradeDowngradeHistory"),
+    ("sustainability", "sustainability", "No sustainability data available", "esgScores"),
+    ("analyst_price_targets", "analyst_price_targets", "No analyst price targets data available", "financialData"),
+    ("insider-purchases", "insider_purchases", "No insider purchases data available", "holders"),
+    ("insider_transactions", "insider_transactions", "No insider transactions data available", "holders"),
+    ("insider_roster_holders", "insider_roster_holders", "No insider roast holders data available", "holders"),
+    ("major_holders", "major_holders", "No major holders data available", "holders"),
+    ("institutional_holders", "institutional_holders", "No institutional holders data available", "holders"),
+    ("mutualfund_holders", "mutualfund_holders", "No mutual fund holders data available", "holders"),
+]
+ANALYSIS_TIMEOUT = 20  # seconds to wait for all analysis attributes
+ANALYSIS_WORKERS = 8  # threads per analysis request, one per request group
+
+BATCH_SIZE = 10  # tickers per chunk for batched info requests
+MAX_BATCH_TICKERS = 20  # most tickers accepted by one batch request
+
 # Helper Functions
 
-def convert_timestamp_to_string(timestamp):
-    return timestamp.strftime("%Y-%m-%d %H:%M:%S") if isinstance(timestamp, (datetime, pd.Timestamp)) else str(timestamp)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+HISTORY_DATE_COLUMNS = ["Date", "Datetime"]
+NEWS_TIMESTAMP_KEY = "providerPublishTime"
+
+# Datetime columns are formatted as a whole so the type check happens once per column, not per cell
+def _fmt_ts_col(series):
+    return series.dt.strftime(TIMESTAMP_FORMAT)
 
-class DateEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, date):
-            return obj.isoformat()
-        return super().default(obj)
+def _fmt_scalar(value):
+    return value.strftime(TIMESTAMP_FORMAT) if hasattr(value, "strftime") else str(value)
+
+def _isoformat(obj):
+    return obj.isoformat()
+
+# orjson only handles exact datetime/date types, so subclasses such as pd.Timestamp are
+# converted here, dispatched on the exact type rather than through an isinstance chain
+_JSON_DEFAULTS = {
+    pd.Timestamp: _isoformat,
+    type(pd.NaT): lambda obj: None,
+    pd.Timedelta: str,
+}
+
+def _json_default(obj):
+    fn = _JSON_DEFAULTS.get(type(obj))
+    if fn is None:
+        if not isinstance(obj, date):
+            raise TypeError
+        # Remember other date subclasses so the isinstance check runs once per type
+        fn = _JSON_DEFAULTS[type(obj)] = _isoformat
+    return fn(obj)
+
+def _dumps(obj):
+    """Serialize to JSON bytes, handling dates, numpy values and NaN"""
+    return orjson.dumps(
+        obj,
+        default=_json_default,
+        option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+def gzip_jsonbytes(payload):
+    # Only the raw bytes are cached; compressing at level 1 per response is cheap.
+    # Level 1 already shrinks the repeated JSON keys several times over at a fraction of the CPU
+    return gzip.compress(payload, compresslevel=1)
+
+def _to_jsonable(obj):
+    """Coerce dates, numpy values and NaN into plain JSON-compatible primitives"""
+    return orjson.loads(_dumps(obj))
 
 def clean_data(data):
-        return {
-            str(key): {
-                sub_key: (None if pd.isna(sub_value) or sub_value in [float('inf'), float('-inf')] else sub_value)
-                for sub_key, sub_value in value.items()
-            }
-            for key, value in data.to_dict().items()
-        } if data is not None else {}
+    if data is None:
+        return {}
+    # Work on the underlying arrays: one NaN/inf mask for the whole frame instead of a check per cell
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes):
+        finite = np.isfinite(data.to_numpy(dtype=float, na_value=np.nan))
+        # Well-formed statements are usually all finite, so no object copy is needed at all
+        if finite.all():
+            return data.rename(columns=str).to_dict()
+        values = data.to_numpy(dtype=object, copy=True)
+        values[~finite] = None
+    else:
+        # Object columns can hold strings next to numbers, so coerce before masking
+        values = data.to_numpy(dtype=object, copy=True)
+        numbers = data.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        values[data.isna().to_numpy() | np.isinf(numbers)] = None
+    index = list(data.index)
+    return {str(col): dict(zip(index, values[:, i])) for i, col in enumerate(data.columns)}
+
+def _df_to_records(df):
+    # Plain tuples from itertuples avoid the per-cell boxing done by to_dict(orient="records")
+    cols = [str(col) for col in df.columns]
+    return [dict(zip(cols, row)) for row in df.itertuples(index=False, name=None)]
+
+def format_historical_data(historical_data):
+    """Convert a price history DataFrame into a list of row dictionaries"""
+    if not isinstance(historical_data, pd.DataFrame):
+        return historical_data
+    historical_data = historical_data.reset_index()
+    # yfinance history always has a "Date" (daily) or "Datetime" (intraday) index and numeric columns
+    dt_cols = historical_data.columns.intersection(HISTORY_DATE_COLUMNS)
+    if len(dt_cols):
+        historical_data[dt_cols[0]] = _fmt_ts_col(historical_data[dt_cols[0]])
+    return _df_to_records(historical_data)
+
+class InvalidBatchError(ValueError):
+    """Raised for a batch request with no tickers or more than MAX_BATCH_TICKERS"""
+
+def _batch_symbols(ticker_symbols):
+    """Normalise and de-duplicate batch tickers, rejecting empty or oversized batches"""
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in ticker_symbols if symbol.strip()))
+    if not symbols:
+        raise InvalidBatchError("No tickers provided")
+    if len(symbols) > MAX_BATCH_TICKERS:
+        raise InvalidBatchError(f"At most {MAX_BATCH_TICKERS} tickers can be requested at once")
+    return symbols
+
+def get_info(ticker_symbol):
+    """Fetch the info dict, remembering symbols Yahoo returns no data for"""
+    info = _ticker(ticker_symbol).info
+    # Unknown symbols come back empty or with only None placeholders
+    if not info or all(value is None for value in info.values()):
+        raise UnknownTickerError(ticker_symbol)
+    return info
 
 # Get the last n quarters from the current date
 def get_last_n_quarters(current_date, n):
@@ -55,8 +307,10 @@ def get_last_n_quarters(current_date, n):
 
 # Main Functions
 
+@reject_unknown_ticker
+@cached("balance_sheet", ttl=DAY)
 def get_balance_sheet_as_json(ticker_symbol):
-    ticker = yf.Ticker(ticker_symbol)
+    ticker = _ticker(ticker_symbol)
     yearly_bs = ticker.balance_sheet
     quarterly_bs = ticker.quarterly_balance_sheet
     yearly_bs_cleaned = clean_data(yearly_bs)
@@ -66,8 +320,10 @@ def get_balance_sheet_as_json(ticker_symbol):
         "quarterly": quarterly_bs_cleaned,
     }
 
+@reject_unknown_ticker
+@cached("cash_flow", ttl=DAY)
 def get_cash_flow_as_json(ticker_symbol, **kwargs):
-    ticker = yf.Ticker(ticker_symbol)
+    ticker = _ticker(ticker_symbol)
     yearly_cf = ticker.cash_flow
     quarterly_cf = ticker.quarterly_cash_flow
     yearly_cf_cleaned = clean_data(yearly_cf)
@@ -77,145 +333,182 @@ def get_cash_flow_as_json(ticker_symbol, **kwargs):
         "quarterly": quarterly_cf_cleaned,
     }
 
+@reject_unknown_ticker
+@cached("historical_data", ttl=MINUTE)
+def get_historical_data_as_jsonbytes(ticker_symbol, **kwargs):
+    # raise_errors makes history() raise YFTickerMissingError for unknown symbols instead
+    # of logging it and returning an empty frame
+    try:
+        historical_data = _ticker(ticker_symbol).history(raise_errors=True, **kwargs)
+    except YFPricesMissingError:
+        # Known symbol, just no prices for this period/interval
+        return _dumps([])
+    return _dumps(format_historical_data(historical_data))
+
 def get_historical_data_as_json(ticker_symbol, **kwargs):
-    historical_data = yf.Ticker(ticker_symbol).history(**kwargs)
-    # handle pandas dataframe
-    if isinstance(historical_data, pd.DataFrame):
-        historical_data = historical_data.reset_index()
-        for col in historical_data.columns:
-            if pd.api.types.is_datetime64_any_dtype(historical_data[col]):
-                historical_data[col] = historical_data[col].apply(convert_timestamp_to_string)
-        # Convert DataFrame to list of dictionaries
-        historical_data = historical_data.to_dict(orient="records")
-    return json.loads(json.dumps(historical_data))
+    return orjson.loads(get_historical_data_as_jsonbytes(ticker_symbol, **kwargs))
 
+def get_historical_data_as_jsonbytes_gz(ticker_symbol, **kwargs):
+    return gzip_jsonbytes(get_historical_data_as_jsonbytes(ticker_symbol, **kwargs))
+
+async def get_historical_data_as_jsonbytes_async(ticker_symbol, compress=False, **kwargs):
+    # Run the blocking yfinance call in a worker thread so the event loop stays free
+    fetch = get_historical_data_as_jsonbytes_gz if compress else get_historical_data_as_jsonbytes
+    return await asyncio.to_thread(fetch, ticker_symbol, **kwargs)
+
+def get_historical_data_batch_as_json(ticker_symbols, **kwargs):
+    """Fetch historical data for several tickers with a single yf.download call"""
+    symbols = _batch_symbols(ticker_symbols)
+    data = yf.download(" ".join(symbols), group_by="ticker", threads=True, progress=False, session=_SESSION, **kwargs)
+    result = {}
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                result[symbol] = []
+                continue
+            frame = data[symbol]
+        else:
+            frame = data
+        result[symbol] = format_historical_data(frame.dropna(how="all"))
+    return _to_jsonable(result)
+
+@reject_unknown_ticker
 def get_sector_and_industry_as_json(ticker_symbol, **kwargs):
-    info = yf.Ticker(ticker_symbol).info
+    # Sector and industry rarely change, so read them from the week-long profile cache
+    info = get_company_profile(ticker_symbol)
     result = {
         "sector": info.get("sector", "N/A"),
         "industry": info.get("industry", "N/A")
     }
     return result
 
-def get_cal_as_json(ticker_symbol, **kwargs):
-    cal = yf.Ticker(ticker_symbol).calendar
+async def get_sector_and_industry_as_json_async(ticker_symbol, **kwargs):
+    return await asyncio.to_thread(get_sector_and_industry_as_json, ticker_symbol, **kwargs)
+
+def get_sector_and_industry_batch_as_json(ticker_symbols):
+    """Fetch sector and industry for several tickers, BATCH_SIZE at a time"""
+    symbols = _batch_symbols(ticker_symbols)
+    result = {}
+    # Yahoo has no multi-symbol endpoint for info, so fetch each chunk concurrently
+    with ThreadPoolExecutor(max_workers=BATCH_SIZE) as executor:
+        for start in range(0, len(symbols), BATCH_SIZE):
+            chunk = symbols[start:start + BATCH_SIZE]
+            futures = {executor.submit(get_sector_and_industry_as_json, symbol): symbol for symbol in chunk}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result[symbol] = future.result()
+                except Exception as e:
+                    result[symbol] = {"error": str(e)}
+    return {symbol: result[symbol] for symbol in symbols}
+
+@reject_unknown_ticker
+def get_cal_as_jsonbytes(ticker_symbol, **kwargs):
+    cal = _ticker(ticker_symbol).calendar
     if cal is None:
-        return json.dumps({"error": "No calendar data available"})
-    return json.loads(json.dumps(cal, cls=DateEncoder))
+        return _dumps({"error": "No calendar data available"})
+    return _dumps(cal)
+
+def get_cal_as_json(ticker_symbol, **kwargs):
+    return orjson.loads(get_cal_as_jsonbytes(ticker_symbol, **kwargs))
 
+@reject_unknown_ticker
+@cached("news", ttl=MINUTE)
 def get_news_as_json(ticker_symbol):
-    news = yf.Ticker(ticker_symbol).news
+    news = _ticker(ticker_symbol).news
     if news is None:
-        return json.dumps({"error": "No calendar data available"})
-    return json.loads(json.dumps(news, cls=DateEncoder))
+        return NoCache({"error": "No calendar data available"})
+    # News items are already JSON primitives; only a datetime publish time needs converting
+    return [
+        {**item, NEWS_TIMESTAMP_KEY: item[NEWS_TIMESTAMP_KEY].isoformat()}
+        if isinstance(item.get(NEWS_TIMESTAMP_KEY), date) else item
+        for item in news
+    ]
+
+def get_news_as_jsonbytes(ticker_symbol):
+    return orjson.dumps(get_news_as_json(ticker_symbol))
 
+@reject_unknown_ticker
+@cached("company_profile", ttl=WEEK)
 def get_company_profile(ticker_symbol):
-    info = yf.Ticker(ticker_symbol).info  # Fetch metadata and profile details
+    info = get_info(ticker_symbol)  # Fetch metadata and profile details
     return info
 
-def get_analysis_data_as_json(ticker_symbol):
+def _fetch_analysis_group(data, attrs):
+    """Read attributes backed by the same request one after another, so it is made only once"""
+    results = []
+    for key, attr in attrs:
+        try:
+            results.append((key, getattr(data, attr), None))
+        except Exception as e:
+            results.append((key, None, e))
+    return results
+
+@reject_unknown_ticker
+@cached("analysis_data", ttl=HOUR)
+def get_analysis_data_as_jsonbytes(ticker_symbol):
     result = {}
     try:
         # Fetch ticker object
-        data = yf.Ticker(ticker_symbol)
-
-        # Access analysis-related attributes
-        analysis_data = {
-            "earnings_estimate": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.earnings_estimate.to_dict().items()}
-                if data.earnings_estimate is not None
-                else "No earnings estimate data available"
-            ),
-            "revenue_estimate": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.revenue_estimate.to_dict().items()}
-                if data.revenue_estimate is not None
-                else "No revenue estimate data available"
-            ),
-            "earnings_history": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.earnings_history.to_dict().items()}
-                if data.earnings_history is not None
-                else "No earnings history data available"
-            ),
-            "eps_trend": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.eps_trend.to_dict().items()}
-                if data.eps_trend is not None
-                else "No EPS trend data available"
-            ),
-            "eps_revisions": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.eps_revisions.to_dict().items()}
-                if data.eps_revisions is not None
-                else "No EPS revisions data available"
-            ),
-            "growth_estimates": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.growth_estimates.to_dict().items()}
-                if data.growth_estimates is not None
-                else "No growth estimate data available"
-            ),
-            "recommendations": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.recommendations.to_dict().items()}
-                if data.recommendations is not None
-                else "No recommendations data available"
-            ),
-            "recommendations_summary": (    
-                {str(key): convert_timestamp_to_string(value) for key, value in data.recommendations_summary.to_dict().items()}
-                if data.recommendations_summary is not None
-                else "No recommendations summary data available"
-            ),
-            "upgrades_downgrades": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.upgrades_downgrades.to_dict().items()}
-                if data.upgrades_downgrades is not None
-                else "No upgrades/downgrades data available"
-            ),
-            "sustainability": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.sustainability.to_dict().items()}
-                if data.sustainability is not None
-                else "No sustainability data available"
-            ),
-            "analyst_price_targets": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.analyst_price_targets.items()}
-                if data.analyst_price_targets is not None
-                else "No analyst price targets data available"
-            ),
-            "insider-purchases": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.insider_purchases.to_dict().items()}
-                if data.insider_purchases is not None
-                else "No insider purchases data available"
-            ),
-            "insider_transactions": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.insider_transactions.to_dict().items()}
-                if data.insider_transactions is not None
-                else "No insider transactions data available"
-            ),
-            "insider_roster_holders": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.insider_roster_holders.to_dict().items()}
-                if data.insider_roster_holders is not None
-                else "No insider roast holders data available"
-            ),
-            "major_holders": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.major_holders.to_dict().items()}
-                if data.major_holders is not None
-                else "No major holders data available"
-            ),
-            "institutional_holders": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.institutional_holders.to_dict().items()}
-                if data.institutional_holders is not None
-                else "No institutional holders data available"
-            ),
-            "mutualfund_holders": (
-                {str(key): convert_timestamp_to_string(value) for key, value in data.mutualfund_holders.to_dict().items()}
-                if data.mutualfund_holders is not None
-                else "No mutual fund holders data available"
-            ),
-        }
+        data = _ticker(ticker_symbol)
 
-        # Serialize the result to JSON format using DateEncoder for date handling
-        result[ticker_symbol] = json.loads(json.dumps(analysis_data, cls=DateEncoder))
+        # Start from the fallbacks so the output order is stable and stalled attributes are covered
+        analysis_data = {key: fallback for key, _, fallback, _ in ANALYSIS_ATTRS}
+        # Timed out or failed attributes leave a fallback in place, so that response isn't cached
+        complete = True
+        not_found = False
 
+        # Each request group is fetched concurrently; attributes within a group share its response
+        groups = {}
+        for key, attr, _, source in ANALYSIS_ATTRS:
+            groups.setdefault(source, []).append((key, attr))
+        executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS)
+        futures = [executor.submit(_fetch_analysis_group, data, attrs) for attrs in groups.values()]
+        try:
+            for future in as_completed(futures, timeout=ANALYSIS_TIMEOUT):
+                for key, value, error in future.result():
+                    if error is not None:
+                        logger.warning("failed to fetch %s for %s: %s", key, ticker_symbol, error)
+                        complete = False
+                        not_found = not_found or _is_not_found(error)
+                        continue
+                    if value is None:
+                        continue
+                    if hasattr(value, "reset_index"):
+                        # Keep meaningful indexes (dates, periods, holders) as a column
+                        value = value.reset_index(drop=isinstance(value.index, pd.RangeIndex))
+                        for col in value.select_dtypes(include=["datetime", "datetimetz"]).columns:
+                            value[col] = _fmt_ts_col(value[col])
+                        analysis_data[key] = _df_to_records(value)
+                    else:
+                        analysis_data[key] = {str(k): _fmt_scalar(v) for k, v in value.items()}
+        except FuturesTimeoutError:
+            logger.warning("analysis data for %s timed out after %ss", ticker_symbol, ANALYSIS_TIMEOUT)
+            complete = False
+        finally:
+            # Drop attributes still queued and don't wait on stalled ones
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if not_found:
+            raise UnknownTickerError(ticker_symbol)
+        result[ticker_symbol] = analysis_data
+
+    except UnknownTickerError:
+        raise
     except Exception as e:
-        result[ticker_symbol] = {"error": str(e)}
+        # Return the error, but let the next request retry instead of caching it for an hour
+        return NoCache(_dumps({ticker_symbol: {"error": str(e)}}))
 
-    return result
+    payload = _dumps(result)
+    return payload if complete else NoCache(payload)
+
+def get_analysis_data_as_jsonbytes_gz(ticker_symbol):
+    return gzip_jsonbytes(get_analysis_data_as_jsonbytes(ticker_symbol))
 
+def get_analysis_data_as_json(ticker_symbol):
+    return orjson.loads(get_analysis_data_as_jsonbytes(ticker_symbol))
+
+@reject_unknown_ticker
 def get_stock_statistics_for_quarters(ticker_symbol, num_quarters):
     """
     Fetch stock statistics for the specified number of quarters
@@ -228,8 +521,8 @@ def get_stock_statistics_for_quarters(ticker_symbol, num_quarters):
         # Validate num_quarters
         num_quarters = max(1, min(num_quarters, 20))  # Limit between 1 and 20 quarters
         
-        ticker = yf.Ticker(ticker_symbol)
-        info = ticker.info
+        ticker = _ticker(ticker_symbol)
+        info = get_info(ticker_symbol)
         
         # Get the specified number of quarters
         dates = get_last_n_quarters(datetime.now(), num_quarters)
@@ -313,12 +606,15 @@ def get_stock_statistics_for_quarters(ticker_symbol, num_quarters):
 
         return statistics
 
-    
+    except UnknownTickerError:
+        raise
     except Exception as e:
         return {"error": str(e)}
 
+@reject_unknown_ticker
+@cached("income_statement", ttl=DAY)
 def get_income_statement_as_json(ticker_symbol, **kwargs):
-    ticker = yf.Ticker(ticker_symbol)
+    ticker = _ticker(ticker_symbol)
     yearly_income_stmt = ticker.financials
     quarterly_income_stmt = ticker.quarterly_financials
     yearly_income_stmt_cleaned = clean_data(yearly_income_stmt)